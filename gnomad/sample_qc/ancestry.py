@@ -5,6 +5,7 @@ import random
 from typing import Any, Counter, List, Optional, Tuple, Union
 
 import hail as hl
+import numpy as np
 import pandas as pd
 from gnomad.utils.filtering import filter_to_autosomes
 
@@ -92,8 +93,6 @@ def pc_project(
     :param af_location: Location of expression for allele frequency in `loadings_ht`
     :return: Table with scores calculated from loadings in column `scores`
     """
-    n_variants = loadings_ht.count()
-
     mt = mt.annotate_rows(
         pca_loadings=loadings_ht[mt.row_key][loading_location],
         pca_af=loadings_ht[mt.row_key][af_location],
@@ -107,12 +106,18 @@ def pc_project(
     )
 
     gt_norm = (mt.GT.n_alt_alleles() - 2 * mt.pca_af) / hl.sqrt(
-        n_variants * 2 * mt.pca_af * (1 - mt.pca_af)
+        2 * mt.pca_af * (1 - mt.pca_af)
     )
 
-    mt = mt.annotate_cols(scores=hl.agg.array_sum(mt.pca_loadings * gt_norm))
+    # Count the projected variants in the same pass as the scores and fold the
+    # 1/sqrt(n_variants) normalization in afterwards, so the genotypes are only
+    # read once
+    mt = mt.annotate_cols(
+        _scores=hl.agg.array_sum(mt.pca_loadings * gt_norm), _n_variants=hl.agg.count(),
+    )
 
-    return mt.cols().select("scores")
+    ht = mt.cols()
+    return ht.select(scores=ht._scores.map(lambda x: x / hl.sqrt(ht._n_variants)))
 
 
 def assign_population_pcs(
@@ -166,11 +171,10 @@ def assign_population_pcs(
         pop_pc_pd = pop_pca_scores.select(known_col, pca_scores=pc_cols).to_pandas()
 
         # Explode the PC array
-        num_out_cols = min([len(x) for x in pop_pc_pd["pca_scores"].values.tolist()])
+        pc_arrays = pop_pc_pd["pca_scores"].to_list()
+        num_out_cols = min(len(x) for x in pc_arrays)
         pc_cols = [f"PC{i+1}" for i in range(num_out_cols)]
-        pop_pc_pd[pc_cols] = pd.DataFrame(pop_pc_pd["pca_scores"].values.tolist())[
-            list(range(num_out_cols))
-        ]
+        pop_pc_pd[pc_cols] = np.array([x[:num_out_cols] for x in pc_arrays])
 
     else:
         pop_pc_pd = pop_pca_scores
@@ -189,10 +193,12 @@ def assign_population_pcs(
 
         # Train RF
         training_set_known_labels = train_fit[known_col].values
-        training_set_pcs = train_fit[pc_cols].values
-        evaluation_set_pcs = evaluate_fit[pc_cols].values
+        training_set_pcs = train_fit[pc_cols].to_numpy(copy=False)
+        evaluation_set_pcs = evaluate_fit[pc_cols].to_numpy(copy=False)
 
-        pop_clf = RandomForestClassifier(n_estimators=n_estimators, random_state=seed)
+        pop_clf = RandomForestClassifier(
+            n_estimators=n_estimators, random_state=seed, n_jobs=-1
+        )
         pop_clf.fit(training_set_pcs, training_set_known_labels)
         print(
             "Random forest feature importances are as follows: {}".format(
@@ -209,10 +215,12 @@ def assign_population_pcs(
     else:
         pop_clf = fit
 
-    # Classify data
-    pop_pc_pd[output_col] = pop_clf.predict(pop_pc_pd[pc_cols].values)
-    probs = pop_clf.predict_proba(pop_pc_pd[pc_cols].values)
-    probs = pd.DataFrame(probs, columns=[f"prob_{p}" for p in pop_clf.classes_])
+    # Classify data; predict() is the argmax of predict_proba(), so walk the
+    # forest once and derive both the labels and the probabilities from it
+    pc_data = pop_pc_pd[pc_cols].to_numpy(copy=False)
+    probs_array = pop_clf.predict_proba(pc_data)
+    pop_pc_pd[output_col] = pop_clf.classes_[probs_array.argmax(axis=1)]
+    probs = pd.DataFrame(probs_array, columns=[f"prob_{p}" for p in pop_clf.classes_])
     pop_pc_pd = pd.concat([pop_pc_pd, probs], axis=1)
     probs["max"] = probs.max(axis=1)
     pop_pc_pd.loc[probs["max"] < min_prob, output_col] = missing_label
@@ -240,6 +248,7 @@ def run_pca_with_relateds(
     related_samples_to_drop: Optional[hl.Table],
     n_pcs: int = 10,
     autosomes_only: bool = True,
+    assume_persisted: bool = False,
 ) -> Tuple[List[float], hl.Table, hl.Table]:
     """
     Run PCA excluding the given related samples, and project those samples in the PC space to return scores for all samples.
@@ -254,9 +263,12 @@ def run_pca_with_relateds(
     :param related_samples_to_drop: Optional table of related samples to drop
     :param n_pcs: Number of PCs to compute
     :param autosomes_only: Whether to run the analysis on autosomes only
+    :param assume_persisted: If set, the input `qc_mt` is not persisted here. Use when the caller already persisted or checkpointed it, to avoid caching it twice.
     :return: eigenvalues, scores and loadings
     """
-    unrelated_mt = qc_mt.persist()
+    if not assume_persisted:
+        qc_mt = qc_mt.persist()
+    unrelated_mt = qc_mt
 
     if autosomes_only:
         unrelated_mt = filter_to_autosomes(unrelated_mt)
@@ -272,6 +284,9 @@ def run_pca_with_relateds(
     pca_af_ht = unrelated_mt.annotate_rows(
         pca_af=hl.agg.mean(unrelated_mt.GT.n_alt_alleles()) / 2
     ).rows()
+    # Checkpoint the AF table so every read of the loadings doesn't re-run
+    # the allele-frequency entry scan over the unrelated MT
+    pca_af_ht = pca_af_ht.checkpoint(hl.utils.new_temp_file("pca_af", "ht"))
     pca_loadings = pca_loadings.annotate(
         pca_af=pca_af_ht[pca_loadings.key].pca_af
     )  # TODO: Evaluate if needed to write results at this point if relateds or not
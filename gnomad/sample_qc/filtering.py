@@ -1,9 +1,11 @@
 # noqa: D100
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Iterable, List, Optional, Tuple
 
 import hail as hl
+import numpy as np
 from gnomad.utils.gen_stats import get_median_and_mad_expr, merge_stats_counters_expr
 from hail.utils.misc import divide_null
 
@@ -28,6 +30,10 @@ def compute_qc_metrics_residuals(
         The `regression_sample_inclusion_expr` can be used to select a subset of the samples to include in the regression calculation.
         Residuals are always computed for all samples.
 
+    .. note::
+
+        The returned Table is not persisted; callers that read it more than once should `checkpoint` it.
+
     :param ht: Input sample QC metrics HT
     :param pc_scores: The expression in the input HT that stores the PC scores
     :param qc_metrics: A dictionary with the name of each QC metric to compute residuals for and their corresponding expression in the input HT.
@@ -59,38 +65,63 @@ def compute_qc_metrics_residuals(
             [_sample_qc_ht.scores[i] * _sample_qc_ht.scores[i] for i in range(0, n_pcs)]
         )
 
-    # Compute linear regressions
-    lms = _sample_qc_ht.aggregate(
-        hl.struct(
+    # Materialize the regressors as a row field so the intercept, PCs and
+    # squared PCs are built once per sample and shared by the regression
+    # collect and the residual computation for every metric
+    _sample_qc_ht = _sample_qc_ht.annotate(_x=hl.array(x_expr))
+
+    # The design matrix is identical for every metric, so collect (X, Y) once
+    # and solve all K regressions in a single local least-squares call, rather
+    # than accumulating one X'X per metric in the distributed aggregation
+    nan = float("nan")
+    # Rows excluded from the regression never enter the scan; residuals are
+    # still computed on the full table below
+    _regress_ht = _sample_qc_ht.filter(_sample_qc_ht._keep)
+    collected = _regress_ht.aggregate(
+        hl.agg.collect(
+            hl.struct(
+                x=_regress_ht._x.map(lambda v: hl.coalesce(hl.float64(v), nan)),
+                y=hl.array(
+                    [
+                        hl.coalesce(hl.float64(_regress_ht[metric]), nan)
+                        for metric in qc_metrics
+                    ]
+                ),
+            )
+        )
+    )
+
+    if not collected:
+        raise ValueError(
+            "No samples satisfy `regression_sample_inclusion_expr`; cannot fit the QC metrics regression."
+        )
+
+    x = np.array([row.x for row in collected])
+    y = np.array([row.y for row in collected])
+    # hl.agg.linreg skips incomplete rows; do the same, jointly across metrics
+    defined = np.isfinite(x).all(axis=1) & np.isfinite(y).all(axis=1)
+    if not defined.any():
+        raise ValueError(
+            "All samples included in the regression have missing PC scores or QC metrics; cannot fit the QC metrics regression."
+        )
+    beta = np.linalg.lstsq(x[defined], y[defined], rcond=None)[0]
+
+    _sample_qc_ht = _sample_qc_ht.annotate_globals(
+        lms=hl.struct(
             **{
-                metric: hl.agg.filter(
-                    _sample_qc_ht._keep,
-                    hl.agg.linreg(y=_sample_qc_ht[metric], x=x_expr),
-                )
-                for metric in qc_metrics
+                metric: hl.struct(beta=beta[:, i].tolist())
+                for i, metric in enumerate(qc_metrics)
             }
         )
     )
 
-    _sample_qc_ht = _sample_qc_ht.annotate_globals(lms=lms).persist()
-
     # Compute residuals
     def get_lm_prediction_expr(metric: str):
-        lm_pred_expr = _sample_qc_ht.lms[metric].beta[0] + hl.sum(
-            hl.range(n_pcs).map(
-                lambda i: _sample_qc_ht.lms[metric].beta[i + 1]
-                * _sample_qc_ht.scores[i]
+        return hl.sum(
+            hl.range(len(x_expr)).map(
+                lambda i: _sample_qc_ht.lms[metric].beta[i] * _sample_qc_ht._x[i]
             )
         )
-        if use_pc_square:
-            lm_pred_expr = lm_pred_expr + hl.sum(
-                hl.range(n_pcs).map(
-                    lambda i: _sample_qc_ht.lms[metric].beta[i + n_pcs + 1]
-                    * _sample_qc_ht.scores[i]
-                    * _sample_qc_ht.scores[i]
-                )
-            )
-        return lm_pred_expr
 
     residuals_ht = _sample_qc_ht.select(
         **{
@@ -99,7 +130,7 @@ def compute_qc_metrics_residuals(
         }
     )
 
-    return residuals_ht.persist()
+    return residuals_ht
 
 
 def compute_stratified_metrics_filter(
@@ -142,14 +173,24 @@ def compute_stratified_metrics_filter(
     if strata is None:
         strata = {}
 
-    ht = ht.select(**qc_metrics, **strata).key_by("s").persist()
+    # Checkpoint the narrowed table so the stats aggregation and the
+    # fail-annotation scan both read the small select, not the input HT
+    ht = ht.select(**qc_metrics, **strata).key_by("s")
+    ht = ht.checkpoint(hl.utils.new_temp_file("stratified_metrics", "ht"))
+
+    if strata:
+        # Build the stratum key once and reuse it for both the group-by
+        # aggregation and the per-sample stats lookup
+        ht = ht.annotate(_strata_key=hl.tuple([ht[x] for x in strata]))
 
     agg_expr = hl.struct(
         **{
             metric: hl.bind(
+                # Double MAD: threshold each tail on its own dispersion so
+                # right-skewed metrics don't need a hand-tuned second pass
                 lambda x: x.annotate(
-                    lower=x.median - _metric_threshold[metric][0] * x.mad,
-                    upper=x.median + _metric_threshold[metric][1] * x.mad,
+                    lower=x.median - _metric_threshold[metric][0] * x.mad_lo,
+                    upper=x.median + _metric_threshold[metric][1] * x.mad_hi,
                 ),
                 get_median_and_mad_expr(ht[metric]),
             )
@@ -160,11 +201,10 @@ def compute_stratified_metrics_filter(
     if strata:
         ht = ht.annotate_globals(
             qc_metrics_stats=ht.aggregate(
-                hl.agg.group_by(hl.tuple([ht[x] for x in strata]), agg_expr),
-                _localize=False,
+                hl.agg.group_by(ht._strata_key, agg_expr), _localize=False
             )
         )
-        metrics_stats_expr = ht.qc_metrics_stats[hl.tuple([ht[x] for x in strata])]
+        metrics_stats_expr = ht.qc_metrics_stats[ht._strata_key]
     else:
         ht = ht.annotate_globals(
             qc_metrics_stats=ht.aggregate(agg_expr, _localize=False)
@@ -177,6 +217,10 @@ def compute_stratified_metrics_filter(
         for metric in qc_metrics
     }
     ht = ht.transmute(**fail_exprs)
+    if strata:
+        # The strata values only fed _strata_key; drop them so the output
+        # schema stays fail_* and the filters set, as without strata
+        ht = ht.drop(*strata)
     stratified_filters = make_filters_expr(ht, qc_metrics)
     return ht.annotate(**{filter_name: stratified_filters})
 
@@ -207,8 +251,12 @@ def compute_stratified_sample_qc(
     else:
         mt = mt.select_entries("GT")
 
-    strat_hts = {}
-    for strat in strata:
+    # Write the narrowed MT (strata booleans + GT only) once, so each
+    # per-stratum sample_qc pass scans this slim copy rather than re-reading
+    # the full input
+    mt = mt.checkpoint(hl.utils.new_temp_file("stratified_sample_qc", "mt"))
+
+    def compute_strat_sample_qc(strat: str) -> hl.Table:
         strat_sample_qc_ht = hl.sample_qc(mt.filter_rows(mt[strat])).cols()
         if tmp_ht_prefix is not None:
             strat_sample_qc_ht = strat_sample_qc_ht.checkpoint(
@@ -216,14 +264,20 @@ def compute_stratified_sample_qc(
             )
         else:
             strat_sample_qc_ht = strat_sample_qc_ht.persist()
-        strat_hts[strat] = strat_sample_qc_ht
+        return strat_sample_qc_ht
 
-    sample_qc_ht = strat_hts.pop(list(strata)[0])
+    # Each stratum is an independent job over the checkpointed MT, so submit
+    # them from a thread pool rather than materializing one after the other
+    with ThreadPoolExecutor(len(strata)) as thread_pool:
+        strat_hts = dict(zip(strata, thread_pool.map(compute_strat_sample_qc, strata)))
+
+    first_strat, *other_strata = strata
+    sample_qc_ht = strat_hts.pop(first_strat)
     sample_qc_ht = sample_qc_ht.select(
-        **{f"{list(strata)[0]}_sample_qc": sample_qc_ht.sample_qc},
+        **{f"{first_strat}_sample_qc": sample_qc_ht.sample_qc},
         **{
             f"{strat}_sample_qc": strat_hts[strat][sample_qc_ht.key].sample_qc
-            for strat in list(strata)[1:]
+            for strat in other_strata
         },
     )
     sample_qc_ht = sample_qc_ht.annotate(
@@ -256,6 +310,11 @@ def merge_sample_qc_expr(
     :param sample_qc_exprs: List of sample QC struct expressions for each stratification
     :return: Combined sample QC results
     """
+    # With a single stratum there is nothing to merge, so return the struct
+    # as-is rather than wrapping every metric in a one-element sum
+    if len(sample_qc_exprs) == 1:
+        return sample_qc_exprs[0]
+
     # List of metrics that can be aggregated by summing
     additive_metrics = [
         "n_called",
@@ -285,9 +344,7 @@ def merge_sample_qc_expr(
     stats_metrics = ["gq_stats", "dp_stats"]
 
     # Gather metrics present in sample qc fields
-    sample_qc_fields = set(sample_qc_exprs[0])
-    for sample_qc_expr in sample_qc_exprs[1:]:
-        sample_qc_fields = sample_qc_fields.union(set(sample_qc_expr))
+    sample_qc_fields = frozenset().union(*sample_qc_exprs)
 
     # Merge additive metrics in sample qc fields
     merged_exprs = {
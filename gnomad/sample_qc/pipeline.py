@@ -49,6 +49,42 @@ def filter_rows_for_qc(
     :paramsnv_only: Whether to only keep SNVs or include other variant types
     :return: annotated and filtered table
     """
+    # Filters only needing row fields are applied first, so that the
+    # aggregators below don't run on rows failing the cheap checks
+    static_filter_expr = []
+    if snv_only:
+        static_filter_expr.append(hl.is_snp(mt.alleles[0], mt.alleles[1]))
+    if bi_allelic_only:
+        static_filter_expr.append(bi_allelic_expr(mt))
+
+    if apply_hard_filters:
+        if "info" in mt.row_value:
+            if "QD" in mt.info:
+                static_filter_expr.append((mt.info.QD >= 2))
+            else:
+                logger.warning(
+                    "Could not apply QD hard filter, as `info.QD` not found in schema."
+                )
+            if "FS" in mt.info:
+                static_filter_expr.append((mt.info.FS <= 60))
+            else:
+                logger.warning(
+                    "Could not apply FS hard filter, as `info.FS` not found in schema."
+                )
+            if "MQ" in mt.info:
+                static_filter_expr.append((mt.info.MQ >= 30))
+            else:
+                logger.warning(
+                    "Could not apply MQ hard filter, as `info.MQ` not found in schema."
+                )
+        else:
+            logger.warning(
+                "Could not apply hard filters as `info` not found in schema."
+            )
+
+    if static_filter_expr:
+        mt = mt.filter_rows(functools.reduce(operator.iand, static_filter_expr))
+
     annotation_expr = {}
 
     if min_af is not None:
@@ -74,37 +110,11 @@ def filter_rows_for_qc(
         filter_expr.append((mt.site_inbreeding_coeff > min_inbreeding_coeff_threshold))
     if min_hardy_weinberg_threshold is not None:
         filter_expr.append((mt.hwe.p_value > min_hardy_weinberg_threshold))
-    if snv_only:
-        filter_expr.append(hl.is_snp(mt.alleles[0], mt.alleles[1]))
-    if bi_allelic_only:
-        filter_expr.append(bi_allelic_expr(mt))
 
-    if apply_hard_filters:
-        if "info" in mt.row_value:
-            if "QD" in mt.info:
-                filter_expr.append((mt.info.QD >= 2))
-            else:
-                logger.warning(
-                    "Could not apply QD hard filter, as `info.QD` not found in schema."
-                )
-            if "FS" in mt.info:
-                filter_expr.append((mt.info.FS <= 60))
-            else:
-                logger.warning(
-                    "Could not apply FS hard filter, as `info.FS` not found in schema."
-                )
-            if "MQ" in mt.info:
-                filter_expr.append((mt.info.MQ >= 30))
-            else:
-                logger.warning(
-                    "Could not apply MQ hard filter, as `info.MQ` not found in schema."
-                )
-        else:
-            logger.warning(
-                "Could not apply hard filters as `info` not found in schema."
-            )
+    if filter_expr:
+        mt = mt.filter_rows(functools.reduce(operator.iand, filter_expr))
 
-    return mt.filter_rows(functools.reduce(operator.iand, filter_expr))
+    return mt
 
 
 def get_qc_mt(
@@ -179,7 +189,10 @@ def get_qc_mt(
     )
 
     if ld_r2 is not None:
-        qc_mt = qc_mt.persist()
+        # Write to stable storage rather than persist, so both the LD-prune
+        # entry walk and the row filter below read the materialized MT instead
+        # of recomputing the QC filters
+        qc_mt = qc_mt.checkpoint(hl.utils.new_temp_file("qc", "mt"), overwrite=True)
         unfiltered_qc_mt = qc_mt.unfilter_entries()
         pruned_ht = hl.ld_prune(unfiltered_qc_mt.GT, r2=ld_r2)
         qc_mt = qc_mt.filter_rows(hl.is_defined(pruned_ht[qc_mt.row_key]))
@@ -295,6 +308,10 @@ def annotate_sex(
     logger.info("Annotating sex ht with sex chromosome ploidies")
     sex_ht = sex_ht.annotate(**ploidy_ht[sex_ht.key])
 
+    # Checkpoint so the ploidy imputation and f-stat computation run once,
+    # rather than once for the cutoff aggregation and again for the output
+    sex_ht = sex_ht.checkpoint(hl.utils.new_temp_file("annotate_sex", "ht"))
+
     logger.info("Inferring sex karyotypes")
     x_ploidy_cutoffs, y_ploidy_cutoffs = get_ploidy_cutoffs(sex_ht, f_stat_cutoff)
     sex_ht = sex_ht.annotate_globals(
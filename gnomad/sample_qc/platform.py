@@ -7,6 +7,7 @@ import hail as hl
 import numpy as np
 from gnomad.utils.annotations import bi_allelic_expr
 from gnomad.utils.filtering import filter_to_autosomes
+from gnomad.utils.reference_genome import get_reference_genome
 
 logging.basicConfig(format="%(levelname)s (%(name)s %(lineno)s): %(message)s")
 logger = logging.getLogger(__name__)
@@ -50,6 +51,12 @@ def compute_callrate_mt(
 
     if autosomes_only:
         callrate_mt = filter_to_autosomes(mt)
+        # Drop non-autosomal intervals up front, so the interval join below
+        # doesn't carry intervals the filtered MT can never match
+        autosomal_contigs = hl.literal(set(get_reference_genome(mt.locus).contigs[:22]))
+        intervals_ht = intervals_ht.filter(
+            autosomal_contigs.contains(intervals_ht.key[0].start.contig)
+        )
 
     if bi_allelic_only:
         callrate_mt = callrate_mt.filter_rows(bi_allelic_expr(callrate_mt))
@@ -133,9 +140,12 @@ def assign_platform_from_pcs(
 
     logger.info("Assigning platforms based on platform PCA clustering")
 
-    # Read and format data for clustering
-    data = platform_pca_scores_ht.to_pandas()
-    callrate_data = np.matrix(data[pc_scores_ann].tolist())
+    # Read and format data for clustering, pulling only the key and scores
+    # across the JVM boundary
+    data = platform_pca_scores_ht.select(pc_scores_ann).to_pandas()
+    # float32 halves the memory HDBSCAN walks during clustering, with no
+    # meaningful precision loss on PCA scores
+    callrate_data = np.vstack(data[pc_scores_ann].values).astype(np.float32)
     logger.info("Assigning platforms to %d samples.", len(callrate_data))
 
     # Cluster data
@@ -150,7 +160,8 @@ def assign_platform_from_pcs(
     )  # NOTE: -1 is the label for noisy (un-classifiable) data points
     logger.info("Found %d unique platforms during platform imputation.", n_clusters)
 
-    data["qc_platform"] = cluster_labels
+    # Format the platform labels before exporting to Hail, so the table is
+    # imported final rather than rewritten by a per-row annotate pass
+    data["qc_platform"] = np.char.add("platform_", cluster_labels.astype(str))
     ht = hl.Table.from_pandas(data, key=[*platform_pca_scores_ht.key])
-    ht = ht.annotate(qc_platform="platform_" + hl.str(ht.qc_platform))
     return ht
@@ -61,31 +61,19 @@ def get_duplicated_samples(
     :param rel_col: Column containing the sample pair relationship annotated with get_relationship_expr
     :return: List of sets of samples that are duplicates
     """
+    parent = {}
 
-    def get_all_dups(
-        s: str, dups: Set[str], samples_duplicates: Dict[str, Set[str]]
-    ) -> Tuple[Set[str], Dict[str, Set[str]]]:
+    def find(s: str) -> str:
         """
-        Create the set of all duplicated samples corresponding to `s` that are found in `sample_duplicates`.
+        Find the representative sample of the duplicate set containing `s`, compressing the path along the way.
 
-        Also return the remaining sample duplicates after removing all duplicated samples corresponding to `s`.
-
-        Works by recursively adding duplicated samples to the set.
-
-        :param s: sample to identify duplicates for
-        :param dups: set of corresponding samples already identified
-        :param samples_duplicates: dict of sample -> duplicate-pair left to assign
-        :return: (set of duplicates corresponding to s found in samples_duplicates, remaining samples_duplicates)
+        :param s: sample to find the representative for
+        :return: Representative sample of the duplicate set containing `s`
         """
-        if s in samples_duplicates:
-            dups.add(s)
-            s_dups = samples_duplicates.pop(s)
-            for s_dup in s_dups:
-                if s_dup not in dups:
-                    dups, samples_duplicates = get_all_dups(
-                        s_dup, dups, samples_duplicates
-                    )
-        return dups, samples_duplicates
+        while parent[s] != s:
+            parent[s] = parent[parent[s]]
+            s = parent[s]
+        return s
 
     logger.info("Computing duplicate sets")
     dup_pairs = relationship_ht.aggregate(
@@ -95,19 +83,18 @@ def get_duplicated_samples(
         )
     )
 
-    samples_duplicates = defaultdict(set)
+    # Union-find over the duplicate pairs, iterative so that large duplicate
+    # clusters cannot hit the Python recursion limit
     for i, j in dup_pairs:
-        samples_duplicates[i].add(j)
-        samples_duplicates[j].add(i)
+        parent.setdefault(i, i)
+        parent.setdefault(j, j)
+        parent[find(i)] = find(j)
 
-    duplicated_samples = []
-    while len(samples_duplicates) > 0:
-        dup_set, samples_duplicates = get_all_dups(
-            list(samples_duplicates)[0], set(), samples_duplicates
-        )
-        duplicated_samples.append(dup_set)
+    duplicated_samples = defaultdict(set)
+    for s in parent:
+        duplicated_samples[find(s)].add(s)
 
-    return duplicated_samples
+    return list(duplicated_samples.values())
 
 
 def get_duplicated_samples_ht(
@@ -127,22 +114,32 @@ def get_duplicated_samples_ht(
     :param rank_ann: Annotation in `samples_ranking_ht` containing each sample global rank (smaller is better).
     :return: HT with duplicate sample sets, including which to keep/filter
     """
+    # Ship all duplicate sets to the backend as a single literal rather than
+    # one Python-built struct per set
+    dups = hl.literal(duplicated_samples)
     dups_ht = hl.Table.parallelize(
-        [
-            hl.struct(dup_set=i, dups=duplicated_samples[i])
-            for i in range(0, len(duplicated_samples))
-        ]
+        hl.range(0, hl.len(dups)).map(lambda i: hl.struct(dup_set=i, dups=dups[i]))
     )
     dups_ht = dups_ht.explode(dups_ht.dups, name="_dup")
     dups_ht = dups_ht.key_by("_dup")
     dups_ht = dups_ht.annotate(rank=samples_rankings_ht[dups_ht.key][rank_ann])
-    dups_cols = hl.bind(
-        lambda x: hl.struct(kept=x[0], filtered=x[1:]),
-        hl.sorted(
-            hl.agg.collect(hl.tuple([dups_ht._dup, dups_ht.rank])), key=lambda x: x[1]
-        ).map(lambda x: x[0]),
+
+    # Duplicate sets are small, so sort each one locally rather than paying a
+    # distributed group-by shuffle plus a per-group sorted collect
+    dup_sets = defaultdict(list)
+    for row in dups_ht.collect():
+        dup_sets[row.dup_set].append((row._dup, row.rank))
+
+    ordered_sets = {
+        i: [s for s, _ in sorted(dup_set, key=lambda x: (x[1] is None, x[1]))]
+        for i, dup_set in dup_sets.items()
+    }
+    dups_ht = hl.Table.parallelize(
+        [
+            hl.struct(dup_set=i, kept=ordered_set[0], filtered=ordered_set[1:])
+            for i, ordered_set in ordered_sets.items()
+        ]
     )
-    dups_ht = dups_ht.group_by(dups_ht.dup_set).aggregate(**dups_cols)
 
     if isinstance(dups_ht.kept, hl.expr.StructExpression):
         dups_ht = dups_ht.key_by(**dups_ht.kept).drop("kept")
@@ -294,6 +291,10 @@ def infer_families(
     :return: Pedigree of complete trios
     """
 
+    def pair_key(a: str, b: str) -> Tuple[str, str]:
+        """Return the canonical, name-ordered key for a sample pair."""
+        return (a, b) if a <= b else (b, a)
+
     def group_parent_child_pairs_by_fam(
         parent_child_pairs: Iterable[Tuple[str, str]]
     ) -> List[List[Tuple[str, str]]]:
@@ -366,20 +367,14 @@ def infer_families(
             :param samples: All samples in the family
             :return: Possible parent pairs
             """
-            possible_parents = []
-            for i in range(len(samples)):
-                for j in range(i + 1, len(samples)):
-                    if (
-                        related_pairs.get(tuple(sorted([samples[i], samples[j]])))
-                        is None
-                    ):
-                        if sex.get(samples[i]) is False and sex.get(samples[j]) is True:
-                            possible_parents.append((samples[i], samples[j]))
-                        elif (
-                            sex.get(samples[i]) is True and sex.get(samples[j]) is False
-                        ):
-                            possible_parents.append((samples[j], samples[i]))
-            return possible_parents
+            males = [s for s in samples if sex.get(s) is False]
+            females = [s for s in samples if sex.get(s) is True]
+            return [
+                (m, f)
+                for m in males
+                for f in females
+                if related_pairs.get(pair_key(m, f)) is None
+            ]
 
         def get_children(possible_parents: Tuple[str, str]) -> List[str]:
             """
@@ -418,10 +413,7 @@ def infer_families(
             """
             for i in range(len(children)):
                 for j in range(i + 1, len(children)):
-                    if (
-                        related_pairs[tuple(sorted([children[i], children[j]]))]
-                        != SIBLINGS
-                    ):
+                    if related_pairs[pair_key(children[i], children[j])] != SIBLINGS:
                         return False
             return True
 
@@ -482,15 +474,13 @@ def infer_families(
 
     # Get all the relations we care about:
     # => Remove unrelateds and duplicates
-    dups = duplicate_samples_ht.aggregate(
-        hl.agg.explode(
-            lambda dup: hl.agg.collect_as_set(dup), duplicate_samples_ht.filtered
-        ),
-        _localize=False,
-    )
+    # Duplicates are kept in a keyed Table and removed with an anti-join, so
+    # the set isn't inlined as a literal into the filter for each reference
+    dup_ht = duplicate_samples_ht.explode(duplicate_samples_ht.filtered)
+    dup_ht = dup_ht.key_by(dup=dup_ht.filtered).select()
     relationship_ht = relationship_ht.filter(
-        ~dups.contains(relationship_ht[i_col])
-        & ~dups.contains(relationship_ht[j_col])
+        hl.is_missing(dup_ht[relationship_ht[i_col]])
+        & hl.is_missing(dup_ht[relationship_ht[j_col]])
         & (relationship_ht[relationship_col] != UNRELATED)
     )
 
@@ -547,9 +537,13 @@ def infer_families(
     # create a dictionnary with pairs as keys and relationships as values
     # Sample-pairs are tuples ordered by sample name
     related_pairs = {
-        tuple(sorted([i, j])): rel
+        pair_key(i, j): rel
         for i, j, rel in hl.tuple(
-            [relationship_ht.i, relationship_ht.j, relationship_ht.relationship]
+            [
+                relationship_ht[i_col],
+                relationship_ht[j_col],
+                relationship_ht[relationship_col],
+            ]
         ).collect()
     }
 
@@ -663,33 +657,37 @@ def compute_related_samples_to_drop(
     relatedness_ht = relatedness_ht.filter(relatedness_ht.kin > kin_threshold)
 
     filtered_samples_rel = set()
-    if min_related_hard_filter is not None:
-        logger.info(
-            "Computing samples related to too many individuals (>%d) for exclusion",
-            min_related_hard_filter,
-        )
+    if min_related_hard_filter is not None or filtered_samples is not None:
         gbi = relatedness_ht.annotate(s=list(relatedness_ht.key))
         gbi = gbi.explode(gbi.s)
-        gbi = gbi.group_by(gbi.s).aggregate(n=hl.agg.count())
-        filtered_samples_rel = gbi.aggregate(
-            hl.agg.filter(gbi.n > min_related_hard_filter, hl.agg.collect_as_set(gbi.s))
-        )
-        logger.info(
-            "Found %d samples with too many 1st/2nd degree relatives. These samples will be excluded.",
-            len(filtered_samples_rel),
-        )
 
-    if filtered_samples is not None:
-        filtered_samples_rel = filtered_samples_rel.union(
-            relatedness_ht.aggregate(
-                hl.agg.explode(
-                    lambda s: hl.agg.collect_as_set(s),
-                    hl.array(list(relatedness_ht.key)).filter(
-                        lambda s: filtered_samples.contains(s)
-                    ),
-                )
+        # Gather the high-degree samples and the hard-filtered samples found
+        # in related pairs with one aggregation over the exploded pairs
+        agg_expr = {}
+        if min_related_hard_filter is not None:
+            logger.info(
+                "Computing samples related to too many individuals (>%d) for exclusion",
+                min_related_hard_filter,
             )
-        )
+            agg_expr["n_related"] = hl.agg.group_by(gbi.s, hl.agg.count())
+        if filtered_samples is not None:
+            agg_expr["filtered"] = hl.agg.filter(
+                filtered_samples.contains(gbi.s), hl.agg.collect_as_set(gbi.s)
+            )
+        agg_result = gbi.aggregate(hl.struct(**agg_expr))
+
+        if min_related_hard_filter is not None:
+            filtered_samples_rel = {
+                s
+                for s, n in agg_result.n_related.items()
+                if n > min_related_hard_filter
+            }
+            logger.info(
+                "Found %d samples with too many 1st/2nd degree relatives. These samples will be excluded.",
+                len(filtered_samples_rel),
+            )
+        if filtered_samples is not None:
+            filtered_samples_rel = filtered_samples_rel.union(agg_result.filtered)
 
     if len(filtered_samples_rel) > 0:
         filtered_samples_lit = hl.literal(filtered_samples_rel)
@@ -730,6 +728,7 @@ def compute_related_samples_to_drop(
             hl.Table.parallelize(
                 [hl.struct(s=s, rank=hl.null(hl.tint64)) for s in filtered_samples_rel],
                 key="s",
+                n_partitions=1,
             )
         )
 
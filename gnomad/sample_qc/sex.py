@@ -34,12 +34,17 @@ def adjusted_sex_ploidy_expr(
     x_nonpar = locus_expr.in_x_nonpar()
     y_par = locus_expr.in_y_par()
     y_nonpar = locus_expr.in_y_nonpar()
-    return (
-        hl.case(missing_false=True)
-        .when(female & (y_par | y_nonpar), hl.null(hl.tcall))
-        .when(male & (x_nonpar | y_nonpar) & gt_expr.is_het(), hl.null(hl.tcall))
-        .when(male & (x_nonpar | y_nonpar), hl.call(gt_expr[0], phased=False))
-        .default(gt_expr)
+    # Bind the male non-PAR predicate so the locus range checks run once per
+    # entry rather than once per case arm
+    return hl.bind(
+        lambda male_nonpar: (
+            hl.case(missing_false=True)
+            .when(female & (y_par | y_nonpar), hl.null(hl.tcall))
+            .when(male_nonpar & gt_expr.is_het(), hl.null(hl.tcall))
+            .when(male_nonpar, hl.call(gt_expr[0], phased=False))
+            .default(gt_expr)
+        ),
+        male & (x_nonpar | y_nonpar),
     )
 
 
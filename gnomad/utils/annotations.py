@@ -1,7 +1,8 @@
 # noqa: D100
 
+import functools
 import logging
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 
 import hail as hl
 from gnomad.utils.gen_stats import to_phred
@@ -13,6 +14,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+_NUMERIC_TYPES = frozenset({hl.tint32, hl.tint64, hl.tfloat32, hl.tfloat64})
+_VCF_INFO_SCALAR_TYPES = _NUMERIC_TYPES | {hl.tstr, hl.tbool}
+
 ANNOTATIONS_HISTS = {
     "FS": (0, 50, 50),  # NOTE: in 2.0.2 release this was on (0,20)
     "InbreedingCoeff": (-0.25, 0.25, 50),
@@ -32,6 +36,12 @@ ANNOTATIONS_HISTS = {
 }
 
 
+@functools.lru_cache(maxsize=None)
+def _pops_to_exclude_expr(pops: FrozenSet[str]) -> hl.expr.SetExpression:
+    """Return a cached Hail set literal of the given populations to exclude."""
+    return hl.literal(set(pops))
+
+
 def pop_max_expr(
     freq: hl.expr.ArrayExpression,
     freq_meta: hl.expr.ArrayExpression,
@@ -58,7 +68,7 @@ def pop_max_expr(
     :return: Popmax struct
     """
     _pops_to_exclude = (
-        hl.literal(pops_to_exclude)
+        _pops_to_exclude_expr(frozenset(pops_to_exclude))
         if pops_to_exclude is not None
         else hl.empty_set(hl.tstr)
     )
@@ -73,8 +83,19 @@ def pop_max_expr(
         lambda i: freq[i].annotate(pop=freq_meta[i]["pop"])
     ).filter(lambda f: f.AC > 0)
 
-    sorted_freqs = hl.sorted(freq_filtered, key=lambda x: x.AF, reverse=True)
-    return hl.or_missing(hl.len(sorted_freqs) > 0, sorted_freqs[0])
+    # A linear fold for the top AF is cheaper than sorting the whole array to
+    # take its first element
+    return hl.bind(
+        lambda fs: hl.or_missing(
+            hl.len(fs) > 0,
+            hl.fold(
+                lambda popmax, f: hl.if_else(f.AF > popmax.AF, f, popmax),
+                fs[0],
+                fs[1:],
+            ),
+        ),
+        freq_filtered,
+    )
 
 
 def project_max_expr(
@@ -118,22 +139,24 @@ def project_max_expr(
         n_alleles > 1,  # Exclude monomorphic sites
         hl.range(1, n_alleles).map(
             lambda ai: hl.sorted(
-                project_cs.filter(
-                    # filter to projects with AF > 0
-                    lambda x: x[1].AF[ai]
-                    > 0
+                # sort indices of the projects with AF > 0 by AF in decreasing
+                # order, so the sort moves ints rather than full callstats structs
+                hl.range(0, hl.len(project_cs)).filter(
+                    lambda i: project_cs[i][1].AF[ai] > 0
                 ),
-                # order the callstats computed by AF in decreasing order
-                lambda x: -x[1].AF[ai]
+                lambda i: -project_cs[i][1].AF[ai]
                 # take the n_projects projects with largest AF
             )[:n_projects].map(
                 # add the project in the callstats struct
-                lambda x: x[1].annotate(
-                    AC=x[1].AC[ai],
-                    AF=x[1].AF[ai],
-                    AN=x[1].AN,
-                    homozygote_count=x[1].homozygote_count[ai],
-                    project=x[0],
+                lambda i: hl.bind(
+                    lambda x: x[1].annotate(
+                        AC=x[1].AC[ai],
+                        AF=x[1].AF[ai],
+                        AN=x[1].AN,
+                        homozygote_count=x[1].homozygote_count[ai],
+                        project=x[0],
+                    ),
+                    project_cs[i],
                 )
             )
         ),
@@ -173,7 +196,7 @@ def faf_expr(
     :return: (FAF expression, FAF metadata)
     """
     _pops_to_exclude = (
-        hl.literal(pops_to_exclude)
+        _pops_to_exclude_expr(frozenset(pops_to_exclude))
         if pops_to_exclude is not None
         else hl.empty_set(hl.tstr)
     )
@@ -716,14 +739,22 @@ def get_adj_expr(
     return (
         (gq_expr >= adj_gq)
         & hl.cond(gt_expr.is_haploid(), dp_expr >= haploid_adj_dp, dp_expr >= adj_dp)
-        & (
-            hl.case()
-            .when(~gt_expr.is_het(), True)
-            .when(gt_expr.is_het_ref(), ad_expr[gt_expr[1]] / dp_expr >= adj_ab)
-            .default(
-                (ad_expr[gt_expr[0]] / dp_expr >= adj_ab)
-                & (ad_expr[gt_expr[1]] / dp_expr >= adj_ab)
-            )
+        & hl.bind(
+            # AD / DP >= ab is rewritten as AD >= ab * DP, computing one
+            # multiply per entry in place of a float division per allele
+            # (DP > 0 is guaranteed by the depth check above whenever this
+            # term decides the result). The allele-index lookups stay inside
+            # the case arms: they are only valid past the het guards, and
+            # gt_expr[1] would error on haploid calls if evaluated eagerly
+            lambda ab_dp: (
+                hl.case()
+                .when(~gt_expr.is_het(), True)
+                .when(gt_expr.is_het_ref(), ad_expr[gt_expr[1]] >= ab_dp)
+                .default(
+                    (ad_expr[gt_expr[0]] >= ab_dp) & (ad_expr[gt_expr[1]] >= ab_dp)
+                )
+            ),
+            adj_ab * dp_expr,
         )
     )
 
@@ -752,17 +783,20 @@ def add_variant_type(alt_alleles: hl.expr.ArrayExpression) -> hl.expr.StructExpr
     ref = alt_alleles[0]
     alts = alt_alleles[1:]
     non_star_alleles = hl.filter(lambda a: a != "*", alts)
-    return hl.struct(
-        variant_type=hl.cond(
-            hl.all(lambda a: hl.is_snp(ref, a), non_star_alleles),
-            hl.cond(hl.len(non_star_alleles) > 1, "multi-snv", "snv"),
-            hl.cond(
-                hl.all(lambda a: hl.is_indel(ref, a), non_star_alleles),
-                hl.cond(hl.len(non_star_alleles) > 1, "multi-indel", "indel"),
-                "mixed",
+    # Count SNPs and indels in one pass over the alleles and classify from the
+    # counts, instead of running a quantifier scan per variant class
+    return hl.bind(
+        lambda n, n_snp, n_indel: hl.struct(
+            variant_type=hl.cond(
+                n_snp == n,
+                hl.cond(n > 1, "multi-snv", "snv"),
+                hl.cond(n_indel == n, hl.cond(n > 1, "multi-indel", "indel"), "mixed",),
             ),
+            n_alt_alleles=n,
         ),
-        n_alt_alleles=hl.len(non_star_alleles),
+        hl.len(non_star_alleles),
+        hl.sum(non_star_alleles.map(lambda a: hl.int(hl.is_snp(ref, a)))),
+        hl.sum(non_star_alleles.map(lambda a: hl.int(hl.is_indel(ref, a)))),
     )
 
 
@@ -773,7 +807,7 @@ def annotation_type_is_numeric(t: Any) -> bool:
     :param t: Type to test
     :return: If the input type is numeric
     """
-    return t in (hl.tint32, hl.tint64, hl.tfloat32, hl.tfloat64)
+    return t in _NUMERIC_TYPES
 
 
 def annotation_type_in_vcf_info(t: Any) -> bool:
@@ -787,13 +821,9 @@ def annotation_type_in_vcf_info(t: Any) -> bool:
     :param t: Type to test
     :return: If the input type can be exported to VCF
     """
-    return (
-        annotation_type_is_numeric(t)
-        or t in (hl.tstr, hl.tbool)
-        or (
-            isinstance(t, (hl.tarray, hl.tset))
-            and annotation_type_in_vcf_info(t.element_type)
-        )
+    return t in _VCF_INFO_SCALAR_TYPES or (
+        isinstance(t, (hl.tarray, hl.tset))
+        and annotation_type_in_vcf_info(t.element_type)
     )
 
 
@@ -954,11 +984,15 @@ def unphase_call_expr(call_expr: hl.expr.CallExpression) -> hl.expr.CallExpressi
     :param call_expr: Input call expression
     :return: unphased call expression
     """
-    return (
-        hl.case()
-        .when(call_expr.is_diploid(), hl.call(call_expr[0], call_expr[1], phased=False))
-        .when(call_expr.is_haploid(), hl.call(call_expr[0], phased=False))
-        .default(hl.null(hl.tcall))
+    # A two-branch if_else on the ploidy is cheaper in the per-entry loop than
+    # the equivalent three-way case switch
+    return hl.rbind(
+        call_expr.ploidy,
+        lambda p: hl.if_else(
+            p == 2,
+            hl.call(call_expr[0], call_expr[1], phased=False),
+            hl.or_missing(p == 1, hl.call(call_expr[0], phased=False)),
+        ),
     )
 
 
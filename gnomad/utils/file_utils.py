@@ -126,12 +126,7 @@ def write_temp_gcs(
 ) -> None:  # noqa: D103
     if not temp_path:
         temp_path = f"/tmp_{uuid.uuid4()}.h"
-    t.write(temp_path, overwrite=True)
-    t = (
-        hl.read_matrix_table(temp_path)
-        if isinstance(t, hl.MatrixTable)
-        else hl.read_table(temp_path)
-    )
+    t = t.checkpoint(temp_path, overwrite=True)
     t.write(gcs_path, overwrite=overwrite)
 
 
@@ -197,21 +192,8 @@ def read_list_data(input_file_path: str) -> List[str]:
     :param input_file_path: File path
     :return: List of lines
     """
-    if input_file_path.startswith("gs://"):
-        hl.hadoop_copy(input_file_path, "file:///" + input_file_path.split("/")[-1])
-        f = (
-            gzip.open("/" + os.path.basename(input_file_path))
-            if input_file_path.endswith("gz")
-            else open("/" + os.path.basename(input_file_path))
-        )
-    else:
-        f = (
-            gzip.open(input_file_path)
-            if input_file_path.endswith("gz")
-            else open(input_file_path)
-        )
-    output = []
-    for line in f:
-        output.append(line.strip())
-    f.close()
-    return output
+    with hl.hadoop_open(input_file_path, "rb") as f:
+        if input_file_path.endswith("gz"):
+            f = gzip.GzipFile(fileobj=f)
+        # splitlines runs in C, avoiding a Python-level strip per line
+        return f.read().decode("utf-8").splitlines()
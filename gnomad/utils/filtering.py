@@ -7,7 +7,7 @@ from typing import Dict, List, Optional, Union
 
 import hail as hl
 from gnomad.resources.resource_utils import DataException
-from gnomad.utils.annotations import annotate_adj
+from gnomad.utils.annotations import get_adj_expr
 from gnomad.utils.reference_genome import get_reference_genome
 
 logging.basicConfig(format="%(levelname)s (%(name)s %(lineno)s): %(message)s")
@@ -17,10 +17,12 @@ logger.setLevel(logging.INFO)
 
 def filter_to_adj(mt: hl.MatrixTable) -> hl.MatrixTable:
     """Filter genotypes to adj criteria."""
-    if "adj" not in list(mt.entry):
-        mt = annotate_adj(mt)
-    mt = mt.filter_entries(mt.adj)
-    return mt.drop(mt.adj)
+    if "adj" in list(mt.entry):
+        mt = mt.filter_entries(mt.adj)
+        return mt.drop(mt.adj)
+    # Filter on the adj expression directly, so the boolean is never
+    # materialized into the entry schema just to be read back and dropped
+    return mt.filter_entries(get_adj_expr(mt.GT, mt.GQ, mt.DP, mt.AD))
 
 
 def filter_by_frequency(
@@ -58,50 +60,51 @@ def filter_by_frequency(
         raise ValueError("At least one of frequency or allele_count must be specified")
     if direction not in ("above", "below", "equal"):
         raise ValueError('direction needs to be one of "above", "below", or "equal"')
+    if downsampling and subpop:
+        raise Exception("No downsampling data for subpopulations implemented")
     group = "adj" if adj else "raw"
-    criteria = [lambda f: f.meta.get("group", "") == group]
-    if frequency is not None:
-        if direction == "above":
-            criteria.append(lambda f: f.AF[1] > frequency)
-        elif direction == "below":
-            criteria.append(lambda f: f.AF[1] < frequency)
-        else:
-            criteria.append(lambda f: f.AF[1] == frequency)
-    if allele_count is not None:
-        if direction == "above":
-            criteria.append(lambda f: f.AC[1] > allele_count)
-        elif direction == "below":
-            criteria.append(lambda f: f.AC[1] < allele_count)
-        else:
-            criteria.append(lambda f: f.AC[1] == allele_count)
     size = 1
     if population:
-        criteria.append(lambda f: f.meta.get("pop", "") == population)
         size += 1
     if subpop:
-        criteria.append(lambda f: f.meta.get("subpop", "") == subpop)
         size += 1
         # If one supplies a subpop but not a population, this will ensure this gets it right
         if not population:
             size += 1
     if downsampling:
-        criteria.append(lambda f: f.meta.get("downsampling", "") == str(downsampling))
         size += 1
         if not population:
             size += 1
-            criteria.append(lambda f: f.meta.get("pop", "") == "global")
-        if subpop:
-            raise Exception("No downsampling data for subpopulations implemented")
-    criteria.append(lambda f: f.meta.size() == size)
 
-    def combine_functions(func_list, x):
-        cond = func_list[0](x)
-        for c in func_list[1:]:
-            cond &= c(x)
-        return cond
-
-    filt = lambda x: combine_functions(criteria, x)
-    criteria = hl.any(filt, t.freq)
+    def freq_criteria(f: hl.expr.StructExpression) -> hl.expr.BooleanExpression:
+        # Build one flat conjunction so the IR sees a single chained `&`
+        # expression rather than a fold over a list of lambdas
+        criteria = (f.meta.get("group", "") == group) & (f.meta.size() == size)
+        if frequency is not None:
+            if direction == "above":
+                criteria &= f.AF[1] > frequency
+            elif direction == "below":
+                criteria &= f.AF[1] < frequency
+            else:
+                criteria &= f.AF[1] == frequency
+        if allele_count is not None:
+            if direction == "above":
+                criteria &= f.AC[1] > allele_count
+            elif direction == "below":
+                criteria &= f.AC[1] < allele_count
+            else:
+                criteria &= f.AC[1] == allele_count
+        if population:
+            criteria &= f.meta.get("pop", "") == population
+        if subpop:
+            criteria &= f.meta.get("subpop", "") == subpop
+        if downsampling:
+            criteria &= f.meta.get("downsampling", "") == str(downsampling)
+            if not population:
+                criteria &= f.meta.get("pop", "") == "global"
+        return criteria
+
+    criteria = hl.any(freq_criteria, t.freq)
     return (
         t.filter_rows(criteria, keep=keep)
         if isinstance(t, hl.MatrixTable)
@@ -109,6 +112,12 @@ def filter_by_frequency(
     )
 
 
+@functools.lru_cache(maxsize=None)
+def _import_locus_intervals(path: str) -> hl.Table:
+    """Import a locus-interval file once per session and reuse the parsed Table."""
+    return hl.import_locus_intervals(path)
+
+
 def filter_low_conf_regions(
     mt: Union[hl.MatrixTable, hl.Table],
     filter_lcr: bool = True,
@@ -136,22 +145,18 @@ def filter_low_conf_regions(
     elif build == "GRCh38":
         import gnomad.resources.grch38.reference_data as resources
 
-    criteria = []
+    excluded_intervals = []
     if filter_lcr:
-        lcr = resources.lcr_intervals.ht()
-        criteria.append(hl.is_missing(lcr[mt.locus]))
+        excluded_intervals.append(resources.lcr_intervals.ht())
 
     if filter_decoy:
-        decoy = resources.decoy_intervals.ht()
-        criteria.append(hl.is_missing(decoy[mt.locus]))
+        excluded_intervals.append(resources.decoy_intervals.ht())
 
     if filter_segdup:
-        segdup = resources.seg_dup_intervals.ht()
-        criteria.append(hl.is_missing(segdup[mt.locus]))
+        excluded_intervals.append(resources.seg_dup_intervals.ht())
 
     if filter_exome_low_coverage_regions:
-        high_cov = resources.high_coverage_intervals.ht()
-        criteria.append(hl.is_missing(high_cov[mt.locus]))
+        excluded_intervals.append(resources.high_coverage_intervals.ht())
 
     if filter_telomeres_and_centromeres:
         if build != "GRCh38":
@@ -159,13 +164,22 @@ def filter_low_conf_regions(
                 "The telomeres_and_centromeres resource only exists for GRCh38"
             )
 
-        telomeres_and_centromeres = resources.telomeres_and_centromeres.ht()
-        criteria.append(hl.is_missing(telomeres_and_centromeres[mt.locus]))
+        excluded_intervals.append(resources.telomeres_and_centromeres.ht())
+
+    criteria = []
+    if excluded_intervals:
+        # Union the excluded intervals into a single Table so that all
+        # exclusions are applied with a single interval join
+        excluded_intervals_ht = excluded_intervals[0].select()
+        for intervals_ht in excluded_intervals[1:]:
+            excluded_intervals_ht = excluded_intervals_ht.union(intervals_ht.select())
+        criteria.append(hl.is_missing(excluded_intervals_ht[mt.locus]))
 
     if high_conf_regions is not None:
-        for region in high_conf_regions:
-            region = hl.import_locus_intervals(region)
-            criteria.append(hl.is_defined(region[mt.locus]))
+        high_conf_ht = _import_locus_intervals(high_conf_regions[0]).select()
+        for region in high_conf_regions[1:]:
+            high_conf_ht = high_conf_ht.union(_import_locus_intervals(region).select())
+        criteria.append(hl.is_defined(high_conf_ht[mt.locus]))
 
     if criteria:
         filter_criteria = functools.reduce(operator.iand, criteria)
@@ -177,6 +191,15 @@ def filter_low_conf_regions(
     return mt
 
 
+@functools.lru_cache(maxsize=None)
+def _autosomes_interval(reference_genome: str) -> hl.expr.IntervalExpression:
+    """Return a cached interval spanning the autosomes of `reference_genome`."""
+    reference = hl.get_reference(reference_genome)
+    return hl.parse_locus_interval(
+        f"{reference.contigs[0]}-{reference.contigs[21]}", reference_genome=reference
+    )
+
+
 def filter_to_autosomes(
     t: Union[hl.MatrixTable, hl.Table]
 ) -> Union[hl.MatrixTable, hl.Table]:
@@ -189,10 +212,7 @@ def filter_to_autosomes(
     :return:  MT/HT autosomes
     """
     reference = get_reference_genome(t.locus)
-    autosomes = hl.parse_locus_interval(
-        f"{reference.contigs[0]}-{reference.contigs[21]}", reference_genome=reference
-    )
-    return hl.filter_intervals(t, [autosomes])
+    return hl.filter_intervals(t, [_autosomes_interval(reference.name)])
 
 
 def add_filters_expr(
@@ -214,13 +234,18 @@ def add_filters_expr(
     if current_filters is None:
         current_filters = hl.empty_set(hl.tstr)
 
-    return hl.fold(
-        lambda x, y: x.union(y),
-        current_filters,
-        [
-            hl.cond(filter_condition, hl.set([filter_name]), hl.empty_set(hl.tstr))
-            for filter_name, filter_condition in filters.items()
-        ],
+    # Build the new filters as one set rather than folding a union over
+    # per-filter singleton sets
+    return current_filters.union(
+        hl.set(
+            hl.filter(
+                lambda x: hl.is_defined(x),
+                [
+                    hl.or_missing(filter_condition, filter_name)
+                    for filter_name, filter_condition in filters.items()
+                ],
+            )
+        )
     )
 
 
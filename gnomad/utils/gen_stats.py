@@ -32,22 +32,39 @@ def from_phred(
 
 
 def get_median_and_mad_expr(
-    metric_expr: hl.expr.ArrayNumericExpression, k: float = 1.4826
+    metric_expr: hl.expr.ArrayNumericExpression, k: float = 1.4826, sketch_k: int = 200,
 ) -> hl.expr.StructExpression:
     """
     Compute the median and median absolute deviation (MAD) for the given expression.
 
+    The median and MAD are estimated from a t-digest sketch of the quartiles
+    (``hl.agg.approx_quantiles``) rather than by collecting all values, so the
+    aggregation streams in bounded memory. The MAD is derived from the
+    inter-quartile range (IQR / 2), which matches the MAD for symmetric
+    distributions.
+
+    In addition to the symmetric ``mad``, the struct contains ``mad_lo`` and
+    ``mad_hi`` (double MAD), the dispersions of the lower and upper halves of
+    the distribution. These allow outlier thresholds that track each tail
+    separately on skewed metrics.
+
     ..note::
 
         The default value of k assumes normally distributed data.
 
     :param metric_expr: Expression to compute median and MAD for
     :param k: The scaling factor for MAD calculation. Default assumes normally distributed data.
-    :return: Struct with median and MAD
+    :param sketch_k: Precision of the underlying quantiles sketch. Larger values are more precise but slower.
+    :return: Struct with median, MAD and lower/upper (double) MADs
     """
     return hl.bind(
-        lambda x: hl.struct(median=x[1], mad=k * hl.median(hl.abs(x[0] - x[1]))),
-        hl.bind(lambda x: hl.tuple([x, hl.median(x)]), hl.agg.collect(metric_expr)),
+        lambda quartiles: hl.struct(
+            median=quartiles[1],
+            mad=k * (quartiles[2] - quartiles[0]) / 2,
+            mad_lo=k * (quartiles[1] - quartiles[0]),
+            mad_hi=k * (quartiles[2] - quartiles[1]),
+        ),
+        hl.agg.approx_quantiles(metric_expr, [0.25, 0.5, 0.75], k=sketch_k),
     )
 
 
@@ -723,7 +723,7 @@ def pair_plot(
                             )
                         )
                     )
-                    for label, (hist, edges) in density_data.iteritems():
+                    for label, (hist, edges) in density_data.items():
                         line_source = ColumnDataSource(
                             {
                                 "edges": edges[:-1],
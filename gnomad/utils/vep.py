@@ -1,5 +1,6 @@
 # noqa: D100
 
+import functools
 import json
 import logging
 import os
@@ -109,6 +110,24 @@ Set containing loss-of-function consequence strings.
 """
 
 
+@functools.lru_cache(maxsize=None)
+def _csq_order_expr() -> hl.expr.ArrayExpression:
+    """Return a cached Hail literal of `CSQ_ORDER`, so repeated calls don't rebuild it."""
+    return hl.literal(CSQ_ORDER)
+
+
+@functools.lru_cache(maxsize=None)
+def _csq_rank_expr() -> hl.expr.DictExpression:
+    """Return a cached Hail literal mapping each consequence in `CSQ_ORDER` to its rank."""
+    return hl.literal(dict(zip(CSQ_ORDER, range(len(CSQ_ORDER)))))
+
+
+@functools.lru_cache(maxsize=None)
+def _loftee_labels_expr() -> hl.expr.ArrayExpression:
+    """Return a cached Hail literal of `LOFTEE_LABELS`, so repeated calls don't rebuild it."""
+    return hl.literal(LOFTEE_LABELS)
+
+
 def get_vep_help(vep_config_path: Optional[str] = None):
     """
     Return the output of vep --help which includes the VEP version.
@@ -239,7 +258,7 @@ def add_most_severe_consequence_to_consequence(
     This is for a given transcript, as there are often multiple annotations for a single transcript:
     e.g. splice_region_variant&intron_variant -> splice_region_variant
     """
-    csqs = hl.literal(CSQ_ORDER)
+    csqs = _csq_order_expr()
 
     return tc.annotate(
         most_severe_consequence=csqs.find(lambda c: tc.consequence_terms.contains(c))
@@ -261,8 +280,8 @@ def process_consequences(
     :param penalize_flags: Whether to penalize LOFTEE flagged variants, or treat them as equal to HC
     :return: MT with better formatted consequences
     """
-    csqs = hl.literal(CSQ_ORDER)
-    csq_dict = hl.literal(dict(zip(CSQ_ORDER, range(len(CSQ_ORDER)))))
+    csqs = _csq_order_expr()
+    csq_dict = _csq_rank_expr()
 
     def find_worst_transcript_consequence(
         tcl: hl.expr.ArrayExpression,
@@ -271,29 +290,29 @@ def process_consequences(
         flag_score = 500
         no_flag_score = flag_score * (1 + penalize_flags)
 
-        def csq_score(tc):
-            return csq_dict[csqs.find(lambda x: x == tc.most_severe_consequence)]
-
+        # Compute the consequence rank once per transcript consequence, then
+        # apply the LOFTEE/PolyPhen adjustments to that precomputed score
+        tcl = tcl.map(
+            lambda tc: tc.annotate(csq_score=csq_dict[tc.most_severe_consequence])
+        )
         tcl = tcl.map(
             lambda tc: tc.annotate(
                 csq_score=hl.case(missing_false=True)
                 .when(
                     (tc.lof == "HC") & (tc.lof_flags == ""),
-                    csq_score(tc) - no_flag_score,
+                    tc.csq_score - no_flag_score,
                 )
                 .when(
-                    (tc.lof == "HC") & (tc.lof_flags != ""), csq_score(tc) - flag_score
+                    (tc.lof == "HC") & (tc.lof_flags != ""), tc.csq_score - flag_score
                 )
-                .when(tc.lof == "OS", csq_score(tc) - 20)
-                .when(tc.lof == "LC", csq_score(tc) - 10)
+                .when(tc.lof == "OS", tc.csq_score - 20)
+                .when(tc.lof == "LC", tc.csq_score - 10)
+                .when(tc.polyphen_prediction == "probably_damaging", tc.csq_score - 0.5)
                 .when(
-                    tc.polyphen_prediction == "probably_damaging", csq_score(tc) - 0.5
+                    tc.polyphen_prediction == "possibly_damaging", tc.csq_score - 0.25
                 )
-                .when(
-                    tc.polyphen_prediction == "possibly_damaging", csq_score(tc) - 0.25
-                )
-                .when(tc.polyphen_prediction == "benign", csq_score(tc) - 0.1)
-                .default(csq_score(tc))
+                .when(tc.polyphen_prediction == "benign", tc.csq_score - 0.1)
+                .default(hl.float64(tc.csq_score))
             )
         )
         return hl.or_missing(hl.len(tcl) > 0, hl.sorted(tcl, lambda x: x.csq_score)[0])
@@ -317,18 +336,22 @@ def process_consequences(
 
     vep_data = mt[vep_root].annotate(
         transcript_consequences=transcript_csqs,
-        worst_consequence_term=csqs.find(
-            lambda c: transcript_csqs.map(
-                lambda csq: csq.most_severe_consequence
-            ).contains(c)
+        worst_consequence_term=hl.bind(
+            lambda present_csqs: csqs.find(lambda c: present_csqs.contains(c)),
+            hl.set(transcript_csqs.map(lambda csq: csq.most_severe_consequence)),
         ),
         worst_csq_by_gene=sorted_scores,
+        worst_csq_by_gene_canonical=sorted_canonical_scores,
+    )
+    # Annotate the per-variant worst consequences from the already-annotated
+    # sorted arrays rather than re-emitting the sort expressions
+    vep_data = vep_data.annotate(
         worst_csq_for_variant=hl.or_missing(
-            hl.len(sorted_scores) > 0, sorted_scores[0]
+            hl.len(vep_data.worst_csq_by_gene) > 0, vep_data.worst_csq_by_gene[0]
         ),
-        worst_csq_by_gene_canonical=sorted_canonical_scores,
         worst_csq_for_variant_canonical=hl.or_missing(
-            hl.len(sorted_canonical_scores) > 0, sorted_canonical_scores[0]
+            hl.len(vep_data.worst_csq_by_gene_canonical) > 0,
+            vep_data.worst_csq_by_gene_canonical[0],
         ),
     )
 
@@ -502,6 +525,16 @@ def get_most_severe_consequence_for_summary(
     :param loftee_labels: Annotations added by LOFTEE. Default is LOFTEE_LABELS.
     :return: Table annotated with VEP summary annotations.
     """
+    # Build the literals once (reusing the cached module-level expressions for
+    # the defaults) instead of once per _get_most_severe_csq call
+    csq_order_expr = (
+        _csq_order_expr() if csq_order is CSQ_ORDER else hl.literal(csq_order)
+    )
+    loftee_labels_expr = (
+        _loftee_labels_expr()
+        if loftee_labels is LOFTEE_LABELS
+        else hl.literal(loftee_labels)
+    )
 
     def _get_most_severe_csq(
         csq_list: hl.expr.ArrayExpression, protein_coding: bool
@@ -517,7 +550,7 @@ def get_most_severe_consequence_for_summary(
         no_lof_flags = hl.null(hl.tbool)
         if protein_coding:
             all_lofs = csq_list.map(lambda x: x.lof)
-            lof = hl.literal(loftee_labels).find(lambda x: all_lofs.contains(x))
+            lof = loftee_labels_expr.find(lambda x: all_lofs.contains(x))
             csq_list = hl.if_else(
                 hl.is_defined(lof), csq_list.filter(lambda x: x.lof == lof), csq_list
             )
@@ -526,9 +559,7 @@ def get_most_severe_consequence_for_summary(
                 csq_list.any(lambda x: (x.lof == lof) & hl.is_missing(x.lof_flags)),
             )
         all_csq_terms = csq_list.flatmap(lambda x: x.consequence_terms)
-        most_severe_csq = hl.literal(csq_order).find(
-            lambda x: all_csq_terms.contains(x)
-        )
+        most_severe_csq = csq_order_expr.find(lambda x: all_csq_terms.contains(x))
         return hl.struct(
             most_severe_csq=most_severe_csq,
             protein_coding=protein_coding,
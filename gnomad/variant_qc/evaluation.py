@@ -390,7 +390,7 @@ def add_rank(
     temp_expr.update({f"_{name}": expr for name, expr in subrank_expr.items()})
     rank_ht = ht.select(**temp_expr, is_snv=hl.is_snp(ht.alleles[0], ht.alleles[1]))
 
-    rank_ht = rank_ht.key_by("_score").persist()
+    rank_ht = rank_ht.key_by("_score")
     scan_expr = {
         "rank": hl.if_else(
             rank_ht.is_snv,
@@ -413,8 +413,12 @@ def add_rank(
     )
     rank_ht = rank_ht.annotate(**scan_expr)
 
-    rank_ht = rank_ht.key_by(*key).persist()
+    rank_ht = rank_ht.key_by(*key)
     rank_ht = rank_ht.select(*scan_expr.keys())
 
+    # Checkpoint the computed ranks to a temp file rather than pinning two
+    # copies of the table in executor memory with persist()
+    rank_ht = rank_ht.checkpoint(hl.utils.new_temp_file("rank", "ht"))
+
     ht = ht.annotate(**rank_ht[key])
     return ht
@@ -16,7 +16,6 @@ from pyspark.sql import SparkSession
 from pyspark.sql.functions import col, udf  # pylint: disable=no-name-in-module
 from pyspark.sql.types import ArrayType, DoubleType
 
-from gnomad.utils.file_utils import file_exists
 
 logging.basicConfig(format="%(levelname)s (%(name)s %(lineno)s): %(message)s")
 logger = logging.getLogger(__name__)
@@ -517,10 +516,21 @@ def get_rf_runs(rf_json_fp: str) -> Dict:
     :param rf_json_fp: File path to rf json file.
     :return: Dictionary containing the content of the JSON file, or an empty dictionary if the file wasn't found.
     """
-    if file_exists(rf_json_fp):
+    # Open directly and handle the missing-file case instead of paying a
+    # separate existence-check RPC before every read
+    try:
         with hl.hadoop_open(rf_json_fp) as f:
             return json.load(f)
-    else:
+    except hl.utils.java.FatalError as e:
+        # Only treat a missing file as empty; any other Java-side failure
+        # (permissions, transient storage errors) must surface to the caller
+        if "FileNotFoundException" not in str(e):
+            raise
+        logger.warning(
+            "File %s could not be found. Returning empty RF run hash dict.", rf_json_fp
+        )
+        return {}
+    except FileNotFoundError:
         logger.warning(
             "File %s could not be found. Returning empty RF run hash dict.", rf_json_fp
         )
@@ -584,7 +594,7 @@ def pretty_print_runs(
         if testing_results is not None:
             # Print results
             res_pd = pd.DataFrame(testing_results)
-            res_pd = res_pd.pivot(
-                index=label_col, columns=prediction_col_name, values="n"
+            res_pd = res_pd.pivot_table(
+                index=label_col, columns=prediction_col_name, values="n", aggfunc="sum"
             )
             logger.info("Testing results:\n%s", pformat(res_pd))